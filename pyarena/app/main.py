@@ -3,14 +3,37 @@ PyArena Main Application
 This is the heart of the Guild Management System that evolves through 13 missions.
 """
 
-from fastapi import FastAPI
+import asyncio
+import httpx
+import orjson
+from fastapi import FastAPI, Response
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import engine, Base
+from app.database import engine, Base, SessionLocal
 from app.routers import users, auth, analytics, external
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+# Static mission catalogue, built once at import
+MISSIONS = [
+    {"id": 1, "name": "The First Flame", "focus": "FastAPI Basics"},
+    {"id": 2, "name": "Records of Apprentices", "focus": "SQLAlchemy & CRUD"},
+    {"id": 3, "name": "Seal of the Keeper", "focus": "JWT Authentication"},
+    {"id": 4, "name": "External Scrolls", "focus": "API Integration"},
+    {"id": 5, "name": "Parallel Prophecies", "focus": "Async Programming"},
+    {"id": 6, "name": "The Guild Archives", "focus": "Data Analysis"},
+    {"id": 7, "name": "Echo of Time", "focus": "Redis Caching"},
+    {"id": 8, "name": "Circle of Truth", "focus": "Testing & CI"},
+    {"id": 9, "name": "The Forge", "focus": "Packaging"},
+    {"id": 10, "name": "Ascension", "focus": "Docker Deployment"},
+    {"id": 11, "name": "The Whispering Stream", "focus": "WebSockets"},
+    {"id": 12, "name": "The Mirror Gateway", "focus": "GraphQL"},
+    {"id": 13, "name": "The Sky Forge", "focus": "Cloud Deployment"},
+]
+MISSIONS_PAYLOAD = {"missions": MISSIONS, "total": len(MISSIONS)}
+MISSIONS_BODY = orjson.dumps(MISSIONS_PAYLOAD)
+
 # Initialize FastAPI app
 app = FastAPI(
     title="PyArena: Guild Management System",
@@ -18,6 +41,7 @@ app = FastAPI(
     version="0.1.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware configuration
@@ -27,8 +51,46 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # keyset pagination cursor for /api/users/
 )
 
+# Session factory for work done outside request handling (the API log writer);
+# tests point it at their own database
+app.state.session_factory = SessionLocal
+
+
+@app.on_event("startup")
+async def startup():
+    """Create the shared HTTP client, external API cache and batched API log writer"""
+    app.state.http = httpx.AsyncClient(
+        timeout=10.0,
+        http2=True,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+    )
+    app.state.public_apis_cache = None
+    app.state.public_apis_lock = asyncio.Lock()
+    app.state.log_queue = asyncio.Queue()
+    app.state.log_writer = asyncio.create_task(
+        external.api_log_writer(app.state.log_queue, app.state.session_factory)
+    )
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Close the shared HTTP client and flush any API logs still queued"""
+    await app.state.http.aclose()
+
+    app.state.log_writer.cancel()
+    try:
+        await app.state.log_writer
+    except asyncio.CancelledError:
+        pass
+    external.write_api_logs(
+        app.state.session_factory,
+        external.drain_api_logs(app.state.log_queue)
+    )
+
+
 # Include routers
 app.include_router(users.router, prefix="/api/users", tags=["users"])
 app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
@@ -57,22 +119,7 @@ async def ping():
 @app.get("/missions")
 async def list_missions():
     """List all available missions in PyArena"""
-    missions = [
-        {"id": 1, "name": "The First Flame", "focus": "FastAPI Basics"},
-        {"id": 2, "name": "Records of Apprentices", "focus": "SQLAlchemy & CRUD"},
-        {"id": 3, "name": "Seal of the Keeper", "focus": "JWT Authentication"},
-        {"id": 4, "name": "External Scrolls", "focus": "API Integration"},
-        {"id": 5, "name": "Parallel Prophecies", "focus": "Async Programming"},
-        {"id": 6, "name": "The Guild Archives", "focus": "Data Analysis"},
-        {"id": 7, "name": "Echo of Time", "focus": "Redis Caching"},
-        {"id": 8, "name": "Circle of Truth", "focus": "Testing & CI"},
-        {"id": 9, "name": "The Forge", "focus": "Packaging"},
-        {"id": 10, "name": "Ascension", "focus": "Docker Deployment"},
-        {"id": 11, "name": "The Whispering Stream", "focus": "WebSockets"},
-        {"id": 12, "name": "The Mirror Gateway", "focus": "GraphQL"},
-        {"id": 13, "name": "The Sky Forge", "focus": "Cloud Deployment"},
-    ]
-    return {"missions": missions, "total": len(missions)}
+    return Response(content=MISSIONS_BODY, media_type="application/json")
 
 
 if __name__ == "__main__":
@@ -24,7 +24,7 @@ class User(Base):
     is_active = Column(Boolean, default=True)
     is_admin = Column(Boolean, default=False)
     guild_rank = Column(String, default="Apprentice")
-    experience_points = Column(Integer, default=0)
+    experience_points = Column(Integer, default=0, index=True)
     missions_completed = Column(Integer, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -41,10 +41,10 @@ class MissionProgress(Base):
     __tablename__ = "mission_progress"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     mission_id = Column(Integer, nullable=False)
     mission_name = Column(String, nullable=False)
-    status = Column(String, default="not_started")  # not_started, in_progress, completed
+    status = Column(String, default="not_started", index=True)  # not_started, in_progress, completed
     score = Column(Float, default=0.0)
     started_at = Column(DateTime(timezone=True))
     completed_at = Column(DateTime(timezone=True))
@@ -63,7 +63,7 @@ class APILog(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
-    endpoint = Column(String, nullable=False)
+    endpoint = Column(String, nullable=False, index=True)
     method = Column(String, default="GET")
     status_code = Column(Integer)
     response_time = Column(Float)  # in milliseconds
@@ -4,54 +4,69 @@ Data analysis and statistics endpoints.
 Mission 6: The Guild Archives
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-import pandas as pd
+from dataclasses import asdict
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import func, case
 from typing import List, Dict, Any
 
 from app.database import get_db
 from app.models import User, MissionProgress, APILog
 from app.schemas import UserStats, MissionStats
 from app.utils.auth_utils import get_current_user
+from app.utils.cache_utils import (
+    get_cached_raw,
+    set_cached,
+    delete_cached,
+    clear_cache_pattern
+)
 
 router = APIRouter()
 
+# Cache keys for aggregates recomputed from the whole users table
+USER_STATS_CACHE_KEY = "stats:users:v1"
+LEADERBOARD_CACHE_KEY = "leaderboard:{limit}"
+ANALYTICS_CACHE_EXPIRE = 60  # seconds
+
+
+async def invalidate_analytics_cache():
+    """
+    Drop cached user statistics and leaderboards.
+    Call this after any change to users, experience or ranks.
+    """
+    await delete_cached(USER_STATS_CACHE_KEY)
+    await clear_cache_pattern(LEADERBOARD_CACHE_KEY.format(limit="*"))
+
 
 @router.get("/users/stats", response_model=UserStats)
 async def get_user_statistics(db: Session = Depends(get_db)):
     """
-    Get overall user statistics using pandas for data analysis.
-    TODO: Add caching for expensive queries.
+    Get overall user statistics aggregated in the database.
+    Mission 7: Echo of Time (cached in Redis)
+    UserStats is built from our own aggregates, so responses bypass
+    response_model validation; the model only documents the schema.
     """
-    # Query all users
-    users = db.query(User).all()
-
-    if not users:
-        return UserStats(
-            total_users=0,
-            active_users=0,
-            total_missions_completed=0,
-            average_experience=0.0
-        )
-
-    # Convert to pandas DataFrame for analysis
-    user_data = pd.DataFrame([
-        {
-            'id': u.id,
-            'is_active': u.is_active,
-            'missions_completed': u.missions_completed,
-            'experience_points': u.experience_points
-        }
-        for u in users
-    ])
-
-    return UserStats(
-        total_users=len(user_data),
-        active_users=int(user_data['is_active'].sum()),
-        total_missions_completed=int(user_data['missions_completed'].sum()),
-        average_experience=float(user_data['experience_points'].mean())
+    cached_stats = await get_cached_raw(USER_STATS_CACHE_KEY)
+    if cached_stats is not None:
+        return Response(cached_stats, media_type="application/json")
+
+    total_users, active_users, total_missions, average_experience = db.query(
+        func.count(User.id),
+        func.sum(case((User.is_active, 1), else_=0)),
+        func.sum(User.missions_completed),
+        func.avg(User.experience_points)
+    ).one()
+
+    stats = UserStats(
+        total_users=total_users,
+        active_users=int(active_users or 0),
+        total_missions_completed=int(total_missions or 0),
+        average_experience=float(average_experience or 0.0)
     )
+    payload = asdict(stats)
+    await set_cached(USER_STATS_CACHE_KEY, payload, ANALYTICS_CACHE_EXPIRE)
+    return ORJSONResponse(payload)
 
 
 @router.get("/missions/stats")
@@ -99,21 +114,31 @@ async def get_user_performance(
     Get detailed performance metrics for a specific user.
     TODO: Add comparison with average user performance.
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    # Eager-load mission progress with one batched SELECT ... IN (no lazy loads)
+    user = db.query(User).options(
+        selectinload(User.missions)
+    ).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
 
-    # Get user's mission progress
-    missions = db.query(MissionProgress).filter(
-        MissionProgress.user_id == user_id
-    ).all()
+    missions = user.missions
+    completed_missions = [m for m in missions if m.status == 'completed']
 
-    # Convert to DataFrame for analysis
-    if missions:
-        mission_data = pd.DataFrame([
+    return {
+        'user_id': user_id,
+        'username': user.username,
+        'guild_rank': user.guild_rank,
+        'total_experience': user.experience_points,
+        'missions_attempted': len(missions),
+        'missions_completed': len(completed_missions),
+        'completion_rate': round(len(completed_missions) / len(missions) * 100, 2)
+                          if missions else 0,
+        'average_score': round(sum(m.score for m in completed_missions) / len(completed_missions), 2)
+                       if completed_missions else 0,
+        'missions': [
             {
                 'mission_id': m.mission_id,
                 'mission_name': m.mission_name,
@@ -123,34 +148,7 @@ async def get_user_performance(
                 'completed_at': m.completed_at
             }
             for m in missions
-        ])
-
-        completed_missions = mission_data[mission_data['status'] == 'completed']
-
-        return {
-            'user_id': user_id,
-            'username': user.username,
-            'guild_rank': user.guild_rank,
-            'total_experience': user.experience_points,
-            'missions_attempted': len(mission_data),
-            'missions_completed': len(completed_missions),
-            'completion_rate': round(len(completed_missions) / len(mission_data) * 100, 2)
-                              if len(mission_data) > 0 else 0,
-            'average_score': round(completed_missions['score'].mean(), 2)
-                           if len(completed_missions) > 0 else 0,
-            'missions': mission_data.to_dict('records')
-        }
-
-    return {
-        'user_id': user_id,
-        'username': user.username,
-        'guild_rank': user.guild_rank,
-        'total_experience': user.experience_points,
-        'missions_attempted': 0,
-        'missions_completed': 0,
-        'completion_rate': 0,
-        'average_score': 0,
-        'missions': []
+        ]
     }
 
 
@@ -161,24 +159,30 @@ async def get_leaderboard(
 ):
     """
     Get top users ranked by experience points.
+    Mission 7: Echo of Time (cached in Redis)
     TODO: Add different ranking categories (missions completed, average score, etc.)
     """
-    users = db.query(User).order_by(
+    cache_key = LEADERBOARD_CACHE_KEY.format(limit=limit)
+    # Cached JSON is already the response body; return it without decoding
+    cached_leaderboard = await get_cached_raw(cache_key)
+    if cached_leaderboard is not None:
+        return Response(cached_leaderboard, media_type="application/json")
+
+    rows = db.query(
+        func.row_number().over(
+            order_by=User.experience_points.desc()
+        ).label('rank'),
+        User.username,
+        User.guild_rank,
+        User.experience_points,
+        User.missions_completed
+    ).order_by(
         User.experience_points.desc()
     ).limit(limit).all()
 
-    leaderboard = [
-        {
-            'rank': idx + 1,
-            'username': user.username,
-            'guild_rank': user.guild_rank,
-            'experience_points': user.experience_points,
-            'missions_completed': user.missions_completed
-        }
-        for idx, user in enumerate(users)
-    ]
-
-    return {'leaderboard': leaderboard}
+    leaderboard = {'leaderboard': [row._asdict() for row in rows]}
+    await set_cached(cache_key, leaderboard, ANALYTICS_CACHE_EXPIRE)
+    return leaderboard
 
 
 @router.get("/api-usage")
@@ -191,9 +195,13 @@ async def get_api_usage_stats(
     Mission 4: External Scrolls
     TODO: Add time-based filtering and aggregation.
     """
-    logs = db.query(APILog).all()
+    total_requests, avg_response_time, success_count = db.query(
+        func.count(APILog.id),
+        func.avg(APILog.response_time),
+        func.sum(case((APILog.status_code < 400, 1), else_=0))
+    ).one()
 
-    if not logs:
+    if not total_requests:
         return {
             'total_requests': 0,
             'average_response_time': 0,
@@ -201,34 +209,25 @@ async def get_api_usage_stats(
             'endpoints': []
         }
 
-    # Convert to DataFrame
-    log_data = pd.DataFrame([
-        {
-            'endpoint': log.endpoint,
-            'method': log.method,
-            'status_code': log.status_code,
-            'response_time': log.response_time
-        }
-        for log in logs
-    ])
-
-    # Calculate statistics
-    total_requests = len(log_data)
-    avg_response_time = log_data['response_time'].mean()
-    success_count = len(log_data[log_data['status_code'] < 400])
-    success_rate = (success_count / total_requests * 100) if total_requests > 0 else 0
+    success_rate = (success_count or 0) / total_requests * 100
 
     # Group by endpoint
-    endpoint_stats = log_data.groupby('endpoint').agg({
-        'status_code': 'count',
-        'response_time': 'mean'
-    }).reset_index()
-
-    endpoint_stats.columns = ['endpoint', 'request_count', 'avg_response_time']
+    endpoint_stats = db.query(
+        APILog.endpoint,
+        func.count(APILog.id).label('request_count'),
+        func.avg(APILog.response_time).label('avg_response_time')
+    ).group_by(APILog.endpoint).all()
 
     return {
         'total_requests': total_requests,
-        'average_response_time': round(avg_response_time, 2),
+        'average_response_time': round(avg_response_time or 0, 2),
         'success_rate': round(success_rate, 2),
-        'endpoints': endpoint_stats.to_dict('records')
+        'endpoints': [
+            {
+                'endpoint': stat.endpoint,
+                'request_count': stat.request_count,
+                'avg_response_time': stat.avg_response_time
+            }
+            for stat in endpoint_stats
+        ]
     }
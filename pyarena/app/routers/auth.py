@@ -12,6 +12,7 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models import User
 from app.schemas import Token, LoginRequest, UserCreate, UserResponse
+from app.routers.analytics import invalidate_analytics_cache
 from app.utils.auth_utils import (
     authenticate_user,
     create_access_token,
@@ -50,6 +51,7 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    await invalidate_analytics_cache()
     return db_user
 
 
@@ -5,15 +5,15 @@ Mission 4: External Scrolls
 Mission 5: Parallel Prophecies (async operations)
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Request
 import httpx
+import orjson
 import asyncio
+import time
 import aiohttp
-from typing import List, Dict, Any
-from datetime import datetime
+from typing import Callable, List, Dict, Any
+from sqlalchemy.orm import Session
 
-from app.database import get_db
 from app.models import User, APILog
 from app.schemas import ExternalAPIRequest, ExternalAPIResponse
 from app.utils.auth_utils import get_current_user
@@ -21,8 +21,14 @@ from app.utils.auth_utils import get_current_user
 router = APIRouter()
 
 
+# API log batching: queued logs are written every LOG_BATCH_SIZE entries
+# or LOG_FLUSH_INTERVAL seconds, whichever comes first
+LOG_BATCH_SIZE = 100
+LOG_FLUSH_INTERVAL = 0.5  # seconds
+
+
 async def log_api_call(
-    db: Session,
+    request: Request,
     user_id: int,
     endpoint: str,
     method: str,
@@ -30,54 +36,109 @@ async def log_api_call(
     response_time: float
 ):
     """
-    Background task to log API calls.
+    Queue an API call log for the background writer.
     Mission 7: Echo of Time (background tasks)
     """
-    log_entry = APILog(
-        user_id=user_id,
-        endpoint=endpoint,
-        method=method,
-        status_code=status_code,
-        response_time=response_time
-    )
-    db.add(log_entry)
-    db.commit()
+    await request.app.state.log_queue.put({
+        'user_id': user_id,
+        'endpoint': endpoint,
+        'method': method,
+        'status_code': status_code,
+        'response_time': response_time
+    })
+
+
+def write_api_logs(session_factory: Callable[[], Session], logs: List[Dict[str, Any]]):
+    """
+    Insert a batch of API logs in a single transaction.
+    Each item holds the APILog column values.
+    """
+    if not logs:
+        return
+
+    db = session_factory()
+    try:
+        db.bulk_insert_mappings(APILog, logs)
+        db.commit()
+    except Exception as e:
+        print(f"API log write error: {e}")
+    finally:
+        db.close()
+
+
+def drain_api_logs(queue: asyncio.Queue) -> List[Dict[str, Any]]:
+    """Take every log currently waiting in the queue without blocking."""
+    logs = []
+    while not queue.empty():
+        logs.append(queue.get_nowait())
+    return logs
+
+
+async def api_log_writer(queue: asyncio.Queue, session_factory: Callable[[], Session]):
+    """
+    Long-running task that drains the API log queue in batches.
+    Started on application startup with app.state.session_factory; see app.main.
+    queue.join() returns once every queued log has been written.
+    """
+    loop = asyncio.get_running_loop()
+    batch = []
+    try:
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + LOG_FLUSH_INTERVAL
+
+            while len(batch) < LOG_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # The DB driver is blocking, so keep the commit off the event loop
+            pending, batch = batch, []
+            await asyncio.to_thread(write_api_logs, session_factory, pending)
+            for _ in pending:
+                queue.task_done()
+    finally:
+        # Don't drop logs collected before the writer was cancelled on shutdown
+        write_api_logs(session_factory, batch)
 
 
 @router.get("/fetch")
 async def fetch_external_data(
     url: str,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    request: Request,
     current_user: User = Depends(get_current_user)
 ):
     """
     Fetch data from an external API using httpx.
     TODO: Add request validation and sanitization.
     """
-    start_time = datetime.now()
+    start_time = time.perf_counter()
 
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url)
-            response_time = (datetime.now() - start_time).total_seconds() * 1000
+    client: httpx.AsyncClient = request.app.state.http
 
-            # Log the API call in the background
-            background_tasks.add_task(
-                log_api_call,
-                db,
-                current_user.id,
-                url,
-                "GET",
-                response.status_code,
-                response_time
-            )
+    try:
+        response = await client.get(url)
+        response_time = (time.perf_counter() - start_time) * 1000.0
+
+        # Queue the API call log for the background writer
+        await log_api_call(
+            request,
+            current_user.id,
+            url,
+            "GET",
+            response.status_code,
+            response_time
+        )
 
-            return ExternalAPIResponse(
-                status_code=response.status_code,
-                data=response.json() if response.headers.get('content-type', '').startswith('application/json') else {'content': response.text},
-                response_time=response_time
-            )
+        return ExternalAPIResponse(
+            status_code=response.status_code,
+            data=orjson.loads(response.content) if response.headers.get('content-type', '').startswith('application/json') else {'content': response.text},
+            response_time=response_time
+        )
 
     except httpx.TimeoutException:
         raise HTTPException(
@@ -99,8 +160,7 @@ async def fetch_external_data(
 @router.post("/fetch-multiple")
 async def fetch_multiple_apis(
     urls: List[str],
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    request: Request,
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -110,15 +170,13 @@ async def fetch_multiple_apis(
     """
     async def fetch_one(url: str, client: httpx.AsyncClient) -> Dict[str, Any]:
         """Helper function to fetch a single URL"""
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         try:
             response = await client.get(url)
-            response_time = (datetime.now() - start_time).total_seconds() * 1000
+            response_time = (time.perf_counter() - start_time) * 1000.0
 
-            # Log in background
-            background_tasks.add_task(
-                log_api_call,
-                db,
+            await log_api_call(
+                request,
                 current_user.id,
                 url,
                 "GET",
@@ -129,7 +187,7 @@ async def fetch_multiple_apis(
             return {
                 'url': url,
                 'status_code': response.status_code,
-                'data': response.json() if response.headers.get('content-type', '').startswith('application/json') else {'content': response.text},
+                'data': orjson.loads(response.content) if response.headers.get('content-type', '').startswith('application/json') else {'content': response.text},
                 'response_time': response_time,
                 'success': True
             }
@@ -140,10 +198,10 @@ async def fetch_multiple_apis(
                 'success': False
             }
 
-    # Fetch all URLs in parallel
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        tasks = [fetch_one(url, client) for url in urls]
-        results = await asyncio.gather(*tasks)
+    # Fetch all URLs in parallel over the shared client
+    client: httpx.AsyncClient = request.app.state.http
+    tasks = [fetch_one(url, client) for url in urls]
+    results = await asyncio.gather(*tasks)
 
     successful = sum(1 for r in results if r.get('success'))
     total_time = sum(r.get('response_time', 0) for r in results if r.get('success'))
@@ -160,6 +218,7 @@ async def fetch_multiple_apis(
 @router.get("/github/user/{username}")
 async def get_github_user(
     username: str,
+    request: Request,
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -168,18 +227,19 @@ async def get_github_user(
     """
     url = f"https://api.github.com/users/{username}"
 
+    client: httpx.AsyncClient = request.app.state.http
+
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url)
+        response = await client.get(url)
 
-            if response.status_code == 404:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"GitHub user '{username}' not found"
-                )
+        if response.status_code == 404:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"GitHub user '{username}' not found"
+            )
 
-            response.raise_for_status()
-            return response.json()
+        response.raise_for_status()
+        return orjson.loads(response.content)
 
     except httpx.HTTPStatusError as e:
         raise HTTPException(
@@ -214,16 +274,24 @@ async def async_operations_demo():
         await asyncio.sleep(1.5)
         return {"task": "three", "result": "completed", "duration": 1.5}
 
-    start_time = datetime.now()
+    loop = asyncio.get_running_loop()
+    start_time = loop.time()
 
-    # Run all tasks in parallel
-    results = await asyncio.gather(
-        task_one(),
-        task_two(),
-        task_three()
-    )
+    # Run all tasks in parallel and cancel the rest if one fails
+    # (asyncio.TaskGroup behaviour, which needs Python 3.11+)
+    tasks = [
+        asyncio.ensure_future(task_one()),
+        asyncio.ensure_future(task_two()),
+        asyncio.ensure_future(task_three())
+    ]
+    try:
+        results = await asyncio.gather(*tasks)
+    except Exception:
+        for task in tasks:
+            task.cancel()
+        raise
 
-    total_time = (datetime.now() - start_time).total_seconds()
+    total_time = loop.time() - start_time
 
     return {
         'message': 'All tasks completed in parallel',
@@ -234,32 +302,63 @@ async def async_operations_demo():
     }
 
 
+PUBLIC_APIS_URL = "https://api.publicapis.org/entries"
+PUBLIC_APIS_CACHE_TTL = 300  # seconds
+
+
+async def _get_public_apis_cached(request: Request) -> Dict[str, Any]:
+    """
+    Return the Public APIs catalogue, refetched at most every PUBLIC_APIS_CACHE_TTL seconds.
+    Entries are also indexed by lowercased category for O(1) filtering.
+    """
+    state = request.app.state
+    cache = state.public_apis_cache
+    if cache is not None and cache['expires_at'] > time.monotonic():
+        return cache
+
+    async with state.public_apis_lock:
+        # Another request may have refreshed the cache while we waited
+        cache = state.public_apis_cache
+        if cache is not None and cache['expires_at'] > time.monotonic():
+            return cache
+
+        response = await state.http.get(PUBLIC_APIS_URL)
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+        entries = data.get('entries') or []
+
+        by_category: Dict[str, List[Dict[str, Any]]] = {}
+        for entry in entries:
+            by_category.setdefault(entry.get('Category', '').lower(), []).append(entry)
+
+        cache = {
+            'count': data.get('count', 0),
+            'entries': entries,
+            'by_category': by_category,
+            'expires_at': time.monotonic() + PUBLIC_APIS_CACHE_TTL
+        }
+        state.public_apis_cache = cache
+        return cache
+
+
 @router.get("/public-apis")
-async def get_public_apis_list(category: str = None):
+async def get_public_apis_list(request: Request, category: str = None):
     """
     Fetch list of public APIs from the Public APIs project.
     Great for testing external API integration!
     """
-    url = "https://api.publicapis.org/entries"
-
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url)
-            response.raise_for_status()
-            data = response.json()
+        data = await _get_public_apis_cached(request)
 
-            if category:
-                # Filter by category
-                entries = [
-                    entry for entry in data.get('entries', [])
-                    if entry.get('Category', '').lower() == category.lower()
-                ]
-                return {'category': category, 'count': len(entries), 'apis': entries}
+        if category:
+            # Filter by category
+            entries = data['by_category'].get(category.lower(), [])
+            return {'category': category, 'count': len(entries), 'apis': entries}
 
-            return {
-                'total': data.get('count', 0),
-                'apis': data.get('entries', [])[:10]  # Return first 10
-            }
+        return {
+            'total': data['count'],
+            'apis': data['entries'][:10]  # Return first 10
+        }
 
     except Exception as e:
         raise HTTPException(
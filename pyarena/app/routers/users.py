@@ -4,17 +4,45 @@ CRUD operations for user management.
 Mission 2: Records of Apprentices
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import case, update
+from sqlalchemy.orm import Session, load_only
+from typing import List, Optional
 
 from app.database import get_db
 from app.models import User
 from app.schemas import UserCreate, UserResponse, UserUpdate
-from app.utils.auth_utils import get_password_hash, get_current_user
+from app.utils.auth_utils import get_password_hash, get_current_user, invalidate_cached_user
+from app.routers.analytics import invalidate_analytics_cache
 
 router = APIRouter()
 
+# Columns rendered by UserResponse (skips hashed_password and updated_at)
+USER_RESPONSE_COLUMNS = (
+    User.id,
+    User.username,
+    User.email,
+    User.full_name,
+    User.is_active,
+    User.is_admin,
+    User.guild_rank,
+    User.experience_points,
+    User.missions_completed,
+    User.created_at,
+)
+
+# Validates a page of ORM rows and dumps it to JSON bytes in pydantic-core
+UserResponseListAdapter = TypeAdapter(List[UserResponse])
+
+
+def to_json_response(model: BaseModel, **kwargs) -> Response:
+    """
+    Serialize a response model straight to JSON bytes with pydantic-core,
+    skipping the intermediate dict FastAPI would build from response_model.
+    """
+    return Response(model.model_dump_json(), media_type="application/json", **kwargs)
+
 
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def create_user(user: UserCreate, db: Session = Depends(get_db)):
@@ -22,19 +50,15 @@ async def create_user(user: UserCreate, db: Session = Depends(get_db)):
     Create a new user (Guild member).
     TODO: Add email validation and duplicate checking.
     """
-    # Check if user already exists
-    db_user = db.query(User).filter(User.email == user.email).first()
-    if db_user:
+    # Check if user already exists (email or username) in a single query
+    existing = db.query(User.email, User.username).filter(
+        (User.email == user.email) | (User.username == user.username)
+    ).first()
+    if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
-
-    db_user = db.query(User).filter(User.username == user.username).first()
-    if db_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already taken"
+            detail="Email already registered" if existing.email == user.email
+            else "Username already taken"
         )
 
     # Create new user
@@ -48,21 +72,46 @@ async def create_user(user: UserCreate, db: Session = Depends(get_db)):
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
-    return db_user
+    await invalidate_analytics_cache()
+    return to_json_response(
+        UserResponse.model_validate(db_user),
+        status_code=status.HTTP_201_CREATED
+    )
 
 
 @router.get("/", response_model=List[UserResponse])
 async def get_users(
-    skip: int = 0,
+    after_id: int = 0,
     limit: int = 100,
+    skip: Optional[int] = Query(None, include_in_schema=False),
     db: Session = Depends(get_db)
 ):
     """
-    Retrieve all Guild members.
-    TODO: Add pagination and filtering.
+    Retrieve Guild members ordered by ID using keyset pagination.
+    Pass the X-Next-Cursor header of a full page as after_id to get the next one.
+    TODO: Add filtering.
     """
-    users = db.query(User).offset(skip).limit(limit).all()
-    return users
+    # Offset pagination was removed; fail loudly instead of silently serving page 1
+    if skip is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="skip is no longer supported; page with after_id and X-Next-Cursor"
+        )
+
+    users = db.query(User).options(
+        load_only(*USER_RESPONSE_COLUMNS)
+    ).filter(User.id > after_id).order_by(User.id).limit(limit).all()
+
+    headers = {}
+    if users and len(users) == limit:
+        headers["X-Next-Cursor"] = str(users[-1].id)
+
+    # Validate ORM rows once and dump straight to JSON bytes
+    return Response(
+        UserResponseListAdapter.dump_json(UserResponseListAdapter.validate_python(users)),
+        media_type="application/json",
+        headers=headers
+    )
 
 
 @router.get("/me", response_model=UserResponse)
@@ -71,7 +120,7 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
     Get current authenticated user's information.
     Mission 3: Seal of the Keeper
     """
-    return current_user
+    return to_json_response(UserResponse.model_validate(current_user))
 
 
 @router.get("/{user_id}", response_model=UserResponse)
@@ -80,13 +129,15 @@ async def get_user(user_id: int, db: Session = Depends(get_db)):
     Retrieve a specific user by ID.
     TODO: Add authorization checks.
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.query(User).options(
+        load_only(*USER_RESPONSE_COLUMNS)
+    ).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    return user
+    return to_json_response(UserResponse.model_validate(user))
 
 
 @router.put("/{user_id}", response_model=UserResponse)
@@ -100,7 +151,9 @@ async def update_user(
     Update user information.
     TODO: Add permission checks (users can only update themselves unless admin).
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.query(User).options(
+        load_only(*USER_RESPONSE_COLUMNS)
+    ).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -121,7 +174,9 @@ async def update_user(
 
     db.commit()
     db.refresh(user)
-    return user
+    await invalidate_cached_user(user.username)
+    await invalidate_analytics_cache()
+    return to_json_response(UserResponse.model_validate(user))
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -140,7 +195,10 @@ async def delete_user(
             detail="Admin privileges required"
         )
 
-    user = db.query(User).filter(User.id == user_id).first()
+    # Only the key columns are needed to delete the row and drop its cache
+    user = db.query(User).options(
+        load_only(User.id, User.username)
+    ).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -149,6 +207,8 @@ async def delete_user(
 
     db.delete(user)
     db.commit()
+    await invalidate_cached_user(user.username)
+    await invalidate_analytics_cache()
     return None
 
 
@@ -170,33 +230,39 @@ async def complete_mission(
             detail="Not authorized"
         )
 
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
+    # Award experience points (10 XP per mission completion) and update the
+    # guild rank based on missions completed, atomically in a single UPDATE
+    experience_earned = int(score / 10)
+    missions_completed = User.missions_completed + 1
+    result = db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(
+            experience_points=User.experience_points + experience_earned,
+            missions_completed=missions_completed,
+            guild_rank=case(
+                (missions_completed >= 13, "Master"),
+                (missions_completed >= 10, "Expert"),
+                (missions_completed >= 7, "Journeyman"),
+                (missions_completed >= 3, "Adept"),
+                else_=User.guild_rank
+            )
+        )
+        .returning(User.username, User.experience_points, User.guild_rank)
+    ).first()
+    if result is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
 
-    # Award experience points (10 XP per mission completion)
-    user.experience_points += int(score / 10)
-    user.missions_completed += 1
-
-    # Update guild rank based on missions completed
-    if user.missions_completed >= 13:
-        user.guild_rank = "Master"
-    elif user.missions_completed >= 10:
-        user.guild_rank = "Expert"
-    elif user.missions_completed >= 7:
-        user.guild_rank = "Journeyman"
-    elif user.missions_completed >= 3:
-        user.guild_rank = "Adept"
-
     db.commit()
-    db.refresh(user)
+    await invalidate_cached_user(result.username)
+    await invalidate_analytics_cache()
 
     return {
         "message": f"Mission {mission_id} completed!",
-        "experience_earned": int(score / 10),
-        "total_experience": user.experience_points,
-        "guild_rank": user.guild_rank
+        "experience_earned": experience_earned,
+        "total_experience": result.experience_points,
+        "guild_rank": result.guild_rank
     }
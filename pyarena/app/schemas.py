@@ -3,9 +3,17 @@ Pydantic Schemas
 Request/Response models for API validation and serialization.
 """
 
+from dataclasses import dataclass
 from pydantic import BaseModel, EmailStr, Field, ConfigDict
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Literal
+
+
+# Closed value sets, validated by pydantic-core as literals. Only input
+# schemas use them: stored rows may predate a value set, and responses must
+# still serialize them.
+GuildRank = Literal["Apprentice", "Adept", "Journeyman", "Expert", "Master"]
+MissionStatus = Literal["not_started", "in_progress", "completed", "failed"]
 
 
 # User Schemas
@@ -25,7 +33,7 @@ class UserUpdate(BaseModel):
     """Schema for updating user information"""
     email: Optional[EmailStr] = None
     full_name: Optional[str] = None
-    guild_rank: Optional[str] = None
+    guild_rank: Optional[GuildRank] = None
 
 
 class UserResponse(UserBase):
@@ -45,7 +53,7 @@ class UserResponse(UserBase):
 class Token(BaseModel):
     """JWT Token response"""
     access_token: str
-    token_type: str = "bearer"
+    token_type: Literal["bearer"] = "bearer"
 
 
 class TokenData(BaseModel):
@@ -69,12 +77,12 @@ class MissionProgressBase(BaseModel):
 
 class MissionProgressCreate(MissionProgressBase):
     """Schema for creating mission progress record"""
-    pass
+    status: MissionStatus = "not_started"
 
 
 class MissionProgressUpdate(BaseModel):
     """Schema for updating mission progress"""
-    status: Optional[str] = None
+    status: Optional[MissionStatus] = None
     score: Optional[float] = None
 
 
@@ -109,7 +117,10 @@ class APILogResponse(APILogCreate):
 
 
 # Analytics Schemas
-class UserStats(BaseModel):
+# Built only from our own query results, so these are plain frozen dataclasses
+# rather than validating models.
+@dataclass(frozen=True)
+class UserStats:
     """User statistics for analytics"""
     total_users: int
     active_users: int
@@ -117,7 +128,8 @@ class UserStats(BaseModel):
     average_experience: float
 
 
-class MissionStats(BaseModel):
+@dataclass(frozen=True)
+class MissionStats:
     """Mission completion statistics"""
     mission_id: int
     mission_name: str
@@ -135,7 +147,8 @@ class ExternalAPIRequest(BaseModel):
     params: Optional[dict] = None
 
 
-class ExternalAPIResponse(BaseModel):
+@dataclass(frozen=True)
+class ExternalAPIResponse:
     """Schema for external API responses"""
     status_code: int
     data: dict
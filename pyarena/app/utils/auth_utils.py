@@ -4,24 +4,53 @@ JWT token generation, password hashing, and authentication helpers.
 Mission 3: Seal of the Keeper
 """
 
+import os
+import time
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+import bcrypt
+import jwt
+from jwt import InvalidTokenError as JWTError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models import User
+from app.schemas import UserResponse
+from app.utils.cache_utils import (
+    cache_available,
+    get_cached,
+    set_cached,
+    delete_cached
+)
 
 # Security configuration
 SECRET_KEY = "your-secret-key-here-change-in-production"  # TODO: Move to environment variables
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# JWT codec and key material, prepared once instead of per token
+_JWT = jwt.PyJWT()
+_JWT_KEY = SECRET_KEY.encode()
+_JWT_ALGORITHMS = [ALGORITHM]
+
+# bcrypt work factor (each +1 doubles hashing cost); lower it only for tests
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# Verified against when the username is unknown so both failure paths cost one bcrypt check
+_DUMMY_HASH = bcrypt.hashpw(b"pyarena-dummy-password", bcrypt.gensalt(rounds=BCRYPT_ROUNDS))
+
+# Dialect-specific INSERTs that support ON CONFLICT DO NOTHING
+_UPSERT_INSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+# Cached user records for get_current_user, keyed by username
+AUTH_USER_CACHE_KEY = "auth_user:{username}"
+AUTH_USER_CACHE_FIELDS = tuple(UserResponse.model_fields)
+AUTH_USER_CACHE_EXPIRE = 30  # seconds
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
@@ -31,23 +60,26 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a plain password against a hashed password.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
 
 
 def get_password_hash(password: str) -> str:
     """
     Hash a password using bcrypt.
     """
-    return pwd_context.hash(password)
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
 
 
 def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
     """
     Authenticate a user by username and password.
     Returns the user if authentication succeeds, None otherwise.
+    Unknown usernames still pay for a bcrypt check, so response time does
+    not reveal whether an account exists.
     """
     user = db.query(User).filter(User.username == username).first()
     if not user:
+        bcrypt.checkpw(password.encode(), _DUMMY_HASH)
         return None
     if not verify_password(password, user.hashed_password):
         return None
@@ -61,12 +93,12 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     """
     to_encode = data.copy()
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = time.time() + expires_delta.total_seconds()
     else:
-        expire = datetime.utcnow() + timedelta(minutes=15)
+        expire = time.time() + 15 * 60
 
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    to_encode.update({"exp": int(expire)})
+    encoded_jwt = _JWT.encode(to_encode, _JWT_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
@@ -77,6 +109,9 @@ async def get_current_user(
     """
     Get the current authenticated user from JWT token.
     This is used as a dependency in protected routes.
+
+    The user record is cached in Redis for AUTH_USER_CACHE_EXPIRE seconds;
+    on a cache hit a detached User (without hashed_password) is returned.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -85,20 +120,44 @@ async def get_current_user(
     )
 
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = _JWT.decode(token, _JWT_KEY, algorithms=_JWT_ALGORITHMS)
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
 
+    cache_key = AUTH_USER_CACHE_KEY.format(username=username)
+    cached_user = await get_cached(cache_key)
+    if cached_user is not None:
+        # Stored data was valid when cached; rebuild it without re-applying the
+        # input rules (EmailStr, username length) that UserResponse inherits
+        if cached_user["created_at"] is not None:
+            cached_user["created_at"] = datetime.fromisoformat(cached_user["created_at"])
+        return User(**cached_user)
+
     user = db.query(User).filter(User.username == username).first()
     if user is None:
         raise credentials_exception
 
+    # Cache the UserResponse columns as-is; they come straight from the DB, so
+    # there is nothing to validate until they are read back
+    if cache_available():
+        await set_cached(
+            cache_key,
+            {field: getattr(user, field) for field in AUTH_USER_CACHE_FIELDS},
+            AUTH_USER_CACHE_EXPIRE
+        )
     return user
 
 
+async def invalidate_cached_user(username: str):
+    """
+    Drop the cached get_current_user record after the user changes.
+    """
+    await delete_cached(AUTH_USER_CACHE_KEY.format(username=username))
+
+
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """
     Get the current active user (must be authenticated and active).
@@ -128,11 +187,12 @@ def create_demo_admin_user(db: Session) -> User:
     Create a demo admin user for testing.
     TODO: Remove this in production!
     """
+    # Cheap check first, so restarts skip the bcrypt hash below
     existing = db.query(User).filter(User.username == "admin").first()
     if existing:
         return existing
 
-    admin_user = User(
+    admin_values = dict(
         username="admin",
         email="admin@pyarena.dev",
         full_name="PyArena Admin",
@@ -140,7 +200,31 @@ def create_demo_admin_user(db: Session) -> User:
         is_admin=True,
         guild_rank="Master"
     )
-    db.add(admin_user)
+
+    insert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if insert is None:
+        # Portable path: the unique username constraint settles a lost race
+        admin_user = User(**admin_values)
+        db.add(admin_user)
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            return db.query(User).filter(User.username == "admin").first()
+        return admin_user
+
+    # ON CONFLICT covers workers racing past the check above
+    stmt = insert(User).values(**admin_values).on_conflict_do_nothing(
+        index_elements=["username"]
+    ).returning(User)
+
+    # RETURNING hands back the new row; only a lost race needs another SELECT.
+    # Detach it over the commit so expire_on_commit doesn't force a reload.
+    admin_user = db.scalars(stmt).first()
+    if admin_user is None:
+        db.commit()
+        return db.query(User).filter(User.username == "admin").first()
+
+    db.expunge(admin_user)
     db.commit()
-    db.refresh(admin_user)
-    return admin_user
+    return db.merge(admin_user, load=False)
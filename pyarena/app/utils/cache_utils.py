@@ -4,54 +4,148 @@ Redis caching helpers and decorators.
 Mission 7: Echo of Time
 """
 
-import json
+import fnmatch
 import functools
+import threading
+import time
 from typing import Optional, Any, Callable
 from datetime import timedelta
 import redis
+import redis.asyncio as aioredis
+from redis.asyncio.connection import BlockingConnectionPool
+import xxhash
+from cachetools import TTLCache
 import os
 
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+    import json
+
 # Redis configuration
 REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
 REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
 REDIS_DB = int(os.getenv("REDIS_DB", 0))
 REDIS_PASSWORD = os.getenv("REDIS_PASSWORD", None)
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+REDIS_RETRY_INTERVAL = 30  # seconds to skip Redis after a connection failure
+REDIS_SCAN_BATCH = 500  # keys per SCAN step and per DEL call
+
+# In-process L1 cache in front of Redis for the cached() decorator; the short
+# TTL bounds how stale a worker can be after another worker invalidates a key
+L1_CACHE_MAXSIZE = 1024
+L1_CACHE_TTL = 5  # seconds
+
+_l1_cache: TTLCache = TTLCache(maxsize=L1_CACHE_MAXSIZE, ttl=L1_CACHE_TTL)
+_l1_lock = threading.Lock()
+_MISSING = object()
+
+# Global async redis client (initialized lazily) and its availability state
+_redis_client: Optional[aioredis.Redis] = None
+_redis_unavailable_until: float = 0.0
+
+
+def _dumps(value: Any) -> bytes:
+    """Serialize a cache value to JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value).encode()
+
+
+def _loads(raw: bytes) -> Any:
+    """Deserialize a cached JSON value"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _l1_get(key: str) -> Any:
+    """Get a value from the in-process cache, or _MISSING"""
+    with _l1_lock:
+        return _l1_cache.get(key, _MISSING)
+
 
-# Global redis client (initialized lazily)
-_redis_client: Optional[redis.Redis] = None
+def _l1_set(key: str, value: Any):
+    """Store a value in the in-process cache"""
+    with _l1_lock:
+        _l1_cache[key] = value
 
 
-def get_redis_client() -> Optional[redis.Redis]:
+def _l1_delete(key: str):
+    """Drop a single key from the in-process cache"""
+    with _l1_lock:
+        _l1_cache.pop(key, None)
+
+
+def _l1_evict(pattern: str):
+    """Drop in-process entries matching a Redis-style glob pattern"""
+    with _l1_lock:
+        for key in [k for k in _l1_cache if fnmatch.fnmatchcase(k, pattern)]:
+            del _l1_cache[key]
+
+
+def make_cache_key(key_prefix: str, func: Callable, args: tuple, kwargs: dict) -> str:
+    """
+    Build a short, order-independent cache key for a function call.
+    Arguments are canonicalized (sorted dict keys, str() for other objects)
+    and hashed with xxh3, so equal calls always map to the same key.
+    """
+    if orjson is not None:
+        payload = orjson.dumps(
+            (args, kwargs),
+            option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+            default=str
+        )
+    else:
+        payload = json.dumps((args, kwargs), sort_keys=True, default=str).encode()
+    return f"{key_prefix}:{func.__name__}:{xxhash.xxh3_64_hexdigest(payload)}"
+
+
+def get_redis_client() -> Optional[aioredis.Redis]:
     """
-    Get or create Redis client instance.
-    Returns None if Redis is not available.
+    Get or create the async Redis client backed by a shared connection pool.
+    The pool connects lazily on first use; returns None while Redis is marked
+    unavailable after a connection failure.
     """
     global _redis_client
 
+    if time.monotonic() < _redis_unavailable_until:
+        return None
+
     if _redis_client is None:
-        try:
-            _redis_client = redis.Redis(
-                host=REDIS_HOST,
-                port=REDIS_PORT,
-                db=REDIS_DB,
-                password=REDIS_PASSWORD,
-                decode_responses=True,
-                socket_connect_timeout=5
-            )
-            # Test connection
-            _redis_client.ping()
-            print(f"✓ Connected to Redis at {REDIS_HOST}:{REDIS_PORT}")
-        except (redis.ConnectionError, redis.TimeoutError) as e:
-            print(f"✗ Redis connection failed: {e}")
-            print("  Continuing without cache...")
-            _redis_client = None
+        pool = BlockingConnectionPool(
+            host=REDIS_HOST,
+            port=REDIS_PORT,
+            db=REDIS_DB,
+            password=REDIS_PASSWORD,
+            max_connections=REDIS_MAX_CONNECTIONS,
+            timeout=5,
+            socket_connect_timeout=5
+        )
+        _redis_client = aioredis.Redis(connection_pool=pool)
 
     return _redis_client
 
 
-async def get_cached(key: str) -> Optional[Any]:
+def cache_available() -> bool:
+    """Whether Redis is configured and not marked unavailable"""
+    return get_redis_client() is not None
+
+
+def _mark_unavailable(error: Exception):
+    """Skip Redis for REDIS_RETRY_INTERVAL seconds after a connection failure"""
+    global _redis_unavailable_until
+
+    print(f"✗ Redis connection failed: {error}")
+    print(f"  Continuing without cache for {REDIS_RETRY_INTERVAL}s...")
+    _redis_unavailable_until = time.monotonic() + REDIS_RETRY_INTERVAL
+
+
+async def get_cached_raw(key: str) -> Optional[bytes]:
     """
-    Get value from cache.
+    Get the raw JSON bytes stored under a key, e.g. to validate them
+    directly with a pydantic TypeAdapter.
     Returns None if key doesn't exist or Redis is unavailable.
     """
     client = get_redis_client()
@@ -59,15 +153,30 @@ async def get_cached(key: str) -> Optional[Any]:
         return None
 
     try:
-        value = client.get(key)
-        if value:
-            return json.loads(value)
+        return await client.get(key)
+    except (redis.ConnectionError, redis.TimeoutError) as e:
+        _mark_unavailable(e)
     except Exception as e:
         print(f"Cache get error: {e}")
 
     return None
 
 
+async def get_cached(key: str) -> Optional[Any]:
+    """
+    Get value from cache.
+    Returns None if key doesn't exist or Redis is unavailable.
+    """
+    value = await get_cached_raw(key)
+    if value:
+        try:
+            return _loads(value)
+        except Exception as e:
+            print(f"Cache get error: {e}")
+
+    return None
+
+
 async def set_cached(key: str, value: Any, expire: int = 300) -> bool:
     """
     Set value in cache with expiration time (default 5 minutes).
@@ -78,9 +187,11 @@ async def set_cached(key: str, value: Any, expire: int = 300) -> bool:
         return False
 
     try:
-        serialized = json.dumps(value)
-        client.setex(key, expire, serialized)
+        await client.setex(key, expire, _dumps(value))
         return True
+    except (redis.ConnectionError, redis.TimeoutError) as e:
+        _mark_unavailable(e)
+        return False
     except Exception as e:
         print(f"Cache set error: {e}")
         return False
@@ -91,13 +202,18 @@ async def delete_cached(key: str) -> bool:
     Delete key from cache.
     Returns True if successful, False otherwise.
     """
+    _l1_delete(key)
+
     client = get_redis_client()
     if client is None:
         return False
 
     try:
-        client.delete(key)
+        await client.delete(key)
         return True
+    except (redis.ConnectionError, redis.TimeoutError) as e:
+        _mark_unavailable(e)
+        return False
     except Exception as e:
         print(f"Cache delete error: {e}")
         return False
@@ -106,16 +222,29 @@ async def delete_cached(key: str) -> bool:
 async def clear_cache_pattern(pattern: str) -> int:
     """
     Delete all keys matching a pattern.
+    Iterates with SCAN and deletes in batches so large keyspaces never block
+    the Redis server the way KEYS does.
     Returns number of keys deleted.
     """
+    _l1_evict(pattern)
+
     client = get_redis_client()
     if client is None:
         return 0
 
     try:
-        keys = client.keys(pattern)
-        if keys:
-            return client.delete(*keys)
+        deleted = 0
+        batch = []
+        async for key in client.scan_iter(match=pattern, count=REDIS_SCAN_BATCH):
+            batch.append(key)
+            if len(batch) >= REDIS_SCAN_BATCH:
+                deleted += await client.delete(*batch)
+                batch.clear()
+        if batch:
+            deleted += await client.delete(*batch)
+        return deleted
+    except (redis.ConnectionError, redis.TimeoutError) as e:
+        _mark_unavailable(e)
         return 0
     except Exception as e:
         print(f"Cache clear error: {e}")
@@ -125,6 +254,8 @@ async def clear_cache_pattern(pattern: str) -> int:
 def cached(expire: int = 300, key_prefix: str = ""):
     """
     Decorator to cache function results.
+    Results are kept in a short-lived in-process cache (L1) in front of Redis (L2).
+    While Redis is unavailable only the in-process cache is used.
 
     Usage:
         @cached(expire=600, key_prefix="user_stats")
@@ -138,15 +269,28 @@ def cached(expire: int = 300, key_prefix: str = ""):
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
             # Generate cache key from function name and arguments
-            cache_key = f"{key_prefix}:{func.__name__}:{str(args)}:{str(kwargs)}"
+            cache_key = make_cache_key(key_prefix, func, args, kwargs)
+
+            # The in-process cache works whether or not Redis is up
+            cached_value = _l1_get(cache_key)
+            if cached_value is not _MISSING:
+                return cached_value
+
+            # Redis is marked down: skip the L2 round-trips until the retry
+            # interval has passed
+            if not cache_available():
+                result = await func(*args, **kwargs)
+                _l1_set(cache_key, result)
+                return result
 
-            # Try to get from cache
             cached_value = await get_cached(cache_key)
             if cached_value is not None:
+                _l1_set(cache_key, cached_value)
                 return cached_value
 
             # Execute function and cache result
             result = await func(*args, **kwargs)
+            _l1_set(cache_key, result)
             await set_cached(cache_key, result, expire)
             return result
 
@@ -166,11 +310,11 @@ async def get_cache_stats() -> dict:
         }
 
     try:
-        info = client.info()
+        info = await client.info()
         return {
             "status": "connected",
             "used_memory": info.get("used_memory_human"),
-            "total_keys": client.dbsize(),
+            "total_keys": await client.dbsize(),
             "connected_clients": info.get("connected_clients"),
             "uptime_seconds": info.get("uptime_in_seconds"),
             "hit_rate": _calculate_hit_rate(info)
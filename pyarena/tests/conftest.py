@@ -3,39 +3,122 @@ Pytest Configuration and Fixtures
 Shared test utilities and fixtures for all tests
 """
 
+import os
+
+# Cheap password hashing for tests; must be set before the app is imported,
+# hence the imports below it
+# ruff: noqa: E402
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+import fakeredis
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from app.database import Base, get_db
 from app.main import app
+from app.models import User
+from app.utils import cache_utils
 
-# Use in-memory SQLite for testing
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+# Use in-memory SQLite for testing; StaticPool shares the single connection
+# so every session (and the TestClient's threads) sees the same database
+SQLALCHEMY_DATABASE_URL = "sqlite://"
 
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
-@pytest.fixture(scope="function")
-def db():
+# pysqlite's implicit transaction handling breaks SAVEPOINT; let SQLAlchemy
+# emit BEGIN itself so per-test rollback works
+@event.listens_for(engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(engine, "begin")
+def _emit_begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
+
+@pytest.fixture(scope="session")
+def tables():
     """
-    Create a fresh database for each test.
-    This ensures test isolation.
+    Create the schema once for the whole test session.
     """
     Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def db(tables):
+    """
+    Database session wrapped in a transaction that is rolled back after each test.
+    Commits inside the app only release a SAVEPOINT, which ensures test isolation.
+    Other TestingSessionLocal sessions (e.g. the API log writer's) join the
+    same transaction for the duration of the test.
+    """
+    connection = engine.connect()
+    transaction = connection.begin()
+    TestingSessionLocal.configure(bind=connection, join_transaction_mode="create_savepoint")
     db = TestingSessionLocal()
     try:
         yield db
     finally:
         db.close()
-        Base.metadata.drop_all(bind=engine)
+        transaction.rollback()
+        connection.close()
+        TestingSessionLocal.configure(bind=engine, join_transaction_mode="conservative_savepoint")
+
+
+@pytest.fixture
+def session_factory(db):
+    """
+    Session factory whose sessions join the current test's transaction
+    """
+    return TestingSessionLocal
+
+
+@pytest.fixture(autouse=True)
+def redis_disabled(monkeypatch):
+    """
+    Run every test without Redis and with an empty in-process cache, so cached
+    users, stats and leaderboards never outlive a test's rolled-back data.
+    Tests that exercise Redis install their own client (see fake_redis).
+    """
+    monkeypatch.setattr(cache_utils, "get_redis_client", lambda: None)
+    cache_utils._l1_cache.clear()
+    yield
+    cache_utils._l1_cache.clear()
+
+
+@pytest.fixture
+def fake_redis(redis_disabled, monkeypatch):
+    """
+    Empty in-memory Redis served by get_redis_client for a single test
+    """
+    client = fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer())
+    monkeypatch.setattr(cache_utils, "get_redis_client", lambda: client)
+    return client
+
+
+@pytest.fixture(scope="session")
+def app_client():
+    """
+    FastAPI test client shared by the whole session, so app startup runs once
+    """
+    app.state.session_factory = TestingSessionLocal
+    with TestClient(app) as test_client:
+        yield test_client
 
 
 @pytest.fixture(scope="function")
-def client(db):
+def client(app_client, db):
     """
     FastAPI test client with test database
     """
@@ -46,8 +129,9 @@ def client(db):
             pass
 
     app.dependency_overrides[get_db] = override_get_db
-    with TestClient(app) as test_client:
-        yield test_client
+    yield app_client
+    # Write queued API logs while this test's transaction is still open
+    app_client.portal.call(app.state.log_queue.join)
     app.dependency_overrides.clear()
 
 
@@ -71,26 +155,53 @@ def create_test_user(client, sample_user_data):
     return response.json()
 
 
-@pytest.fixture
-def get_auth_token(client, sample_user_data):
+@pytest.fixture(scope="session")
+def auth_token_cache():
     """
-    Create a user and get authentication token
+    Password hash and access token per username, reused across tests
     """
-    # Create user
-    client.post("/api/users/", json=sample_user_data)
+    return {}
 
-    # Login to get token
-    login_data = {
-        "username": sample_user_data["username"],
-        "password": sample_user_data["password"]
-    }
-    response = client.post(
-        "/api/auth/token",
-        data=login_data,  # OAuth2 uses form data
-        headers={"Content-Type": "application/x-www-form-urlencoded"}
-    )
-    token = response.json()["access_token"]
-    return token
+
+@pytest.fixture
+def get_auth_token(client, db, sample_user_data, auth_token_cache):
+    """
+    Create a user and get authentication token.
+    Registration and login (one bcrypt hash and verify) run once per session;
+    later tests re-insert the user with the cached hash and reuse the token.
+    """
+    username = sample_user_data["username"]
+    cached = auth_token_cache.get(username)
+
+    if cached is None:
+        # Create user
+        client.post("/api/users/", json=sample_user_data)
+
+        # Login to get token
+        login_data = {
+            "username": username,
+            "password": sample_user_data["password"]
+        }
+        response = client.post(
+            "/api/auth/token",
+            data=login_data,  # OAuth2 uses form data
+            headers={"Content-Type": "application/x-www-form-urlencoded"}
+        )
+        hashed_password = db.query(User.hashed_password).filter(
+            User.username == username
+        ).scalar()
+        cached = auth_token_cache[username] = (hashed_password, response.json()["access_token"])
+
+    elif db.query(User.id).filter(User.username == username).first() is None:
+        db.add(User(
+            username=username,
+            email=sample_user_data["email"],
+            full_name=sample_user_data["full_name"],
+            hashed_password=cached[0]
+        ))
+        db.commit()
+
+    return cached[1]
 
 
 @pytest.fixture
@@ -3,6 +3,8 @@ Test Analytics Endpoints
 Mission 6: The Guild Archives
 """
 
+from app.models import APILog, MissionProgress, User
+
 
 def test_get_user_statistics(client, create_test_user):
     """Test user statistics endpoint"""
@@ -17,6 +19,17 @@ def test_get_user_statistics(client, create_test_user):
     assert data["total_users"] >= 1
 
 
+def test_get_user_statistics_cached(client, create_test_user, fake_redis):
+    """Test cached statistics are served as stored once computed"""
+    first = client.get("/api/analytics/users/stats")
+    assert client.portal.call(fake_redis.exists, "stats:users:v1")
+
+    second = client.get("/api/analytics/users/stats")
+    assert second.status_code == 200
+    assert second.headers["content-type"] == "application/json"
+    assert second.json() == first.json()
+
+
 def test_get_mission_statistics(client):
     """Test mission statistics endpoint"""
     response = client.get("/api/analytics/missions/stats")
@@ -58,3 +71,73 @@ def test_get_user_performance(client, create_test_user, auth_headers):
     assert "missions_attempted" in data
     assert "missions_completed" in data
     assert "completion_rate" in data
+
+
+def test_get_api_usage_stats(client, db, auth_headers):
+    """Test API usage aggregation per endpoint"""
+    db.add_all([
+        APILog(endpoint="https://a.example", status_code=200, response_time=10.0),
+        APILog(endpoint="https://a.example", status_code=500, response_time=30.0),
+        APILog(endpoint="https://b.example", status_code=200, response_time=20.0),
+    ])
+    db.commit()
+
+    response = client.get("/api/analytics/api-usage", headers=auth_headers)
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["total_requests"] == 3
+    assert data["average_response_time"] == 20.0
+    assert data["success_rate"] == 66.67
+
+    endpoints = {e["endpoint"]: e for e in data["endpoints"]}
+    assert endpoints["https://a.example"]["request_count"] == 2
+    assert endpoints["https://a.example"]["avg_response_time"] == 20.0
+    assert endpoints["https://b.example"]["request_count"] == 1
+
+
+def test_get_user_performance_with_missions(client, db, create_test_user, auth_headers):
+    """Test performance metrics aggregate the user's mission progress"""
+    user_id = create_test_user["id"]
+    db.add_all([
+        MissionProgress(user_id=user_id, mission_id=1, mission_name="The First Flame",
+                        status="completed", score=90.0),
+        MissionProgress(user_id=user_id, mission_id=2, mission_name="Records of Apprentices",
+                        status="completed", score=70.0),
+        MissionProgress(user_id=user_id, mission_id=3, mission_name="Seal of the Keeper",
+                        status="in_progress", score=0.0),
+    ])
+    db.commit()
+
+    response = client.get(
+        f"/api/analytics/users/{user_id}/performance",
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["missions_attempted"] == 3
+    assert data["missions_completed"] == 2
+    assert data["completion_rate"] == 66.67
+    assert data["average_score"] == 80.0
+    assert len(data["missions"]) == 3
+
+
+def test_leaderboard_ranking(client, db):
+    """Test leaderboard ranks users by experience points"""
+    db.add_all([
+        User(username="novice", email="novice@example.com", hashed_password="x",
+             experience_points=5),
+        User(username="veteran", email="veteran@example.com", hashed_password="x",
+             experience_points=50),
+    ])
+    db.commit()
+
+    response = client.get("/api/analytics/leaderboard?limit=1")
+    assert response.status_code == 200
+
+    leaderboard = response.json()["leaderboard"]
+    assert len(leaderboard) == 1
+    assert leaderboard[0]["rank"] == 1
+    assert leaderboard[0]["username"] == "veteran"
+    assert "hashed_password" not in leaderboard[0]
@@ -3,6 +3,10 @@ Test Authentication Endpoints
 Mission 3: Seal of the Keeper
 """
 
+from app.models import User
+from app.utils import auth_utils
+from app.utils.auth_utils import create_demo_admin_user
+
 
 def test_register_user(client):
     """Test user registration"""
@@ -101,3 +105,73 @@ def test_protected_endpoint_invalid_token(client):
     headers = {"Authorization": "Bearer invalid_token"}
     response = client.get("/api/users/me", headers=headers)
     assert response.status_code == 401
+
+
+def test_create_demo_admin_user_idempotent(db, monkeypatch):
+    """Test the demo admin is inserted once and reused without rehashing"""
+    first = create_demo_admin_user(db)
+
+    def fail_hash(password):
+        raise AssertionError("existing admin should not be rehashed")
+
+    monkeypatch.setattr(auth_utils, "get_password_hash", fail_hash)
+    second = create_demo_admin_user(db)
+
+    assert first.id == second.id
+    assert second.is_admin
+    assert db.query(User).filter(User.username == "admin").count() == 1
+
+
+def test_create_demo_admin_user_other_dialect(db, monkeypatch):
+    """Test dialects without ON CONFLICT fall back to a plain ORM insert"""
+    monkeypatch.setattr(db.get_bind().dialect, "name", "mssql")
+
+    admin_user = create_demo_admin_user(db)
+    assert admin_user.is_admin
+    assert create_demo_admin_user(db).id == admin_user.id
+    assert db.query(User).filter(User.username == "admin").count() == 1
+
+
+def test_create_demo_admin_user_other_dialect_lost_race(db, monkeypatch):
+    """Test the fallback returns the admin another worker inserted first"""
+    monkeypatch.setattr(db.get_bind().dialect, "name", "mssql")
+    db.add(User(username="admin", email="first@pyarena.dev", hashed_password="x"))
+    db.commit()
+
+    # Make the existence check miss, as if the other worker committed after it
+    query = db.query
+    misses = []
+
+    def racing_query(*entities):
+        result = query(*entities)
+        if not misses:
+            misses.append(True)
+            return result.filter(User.id.is_(None))
+        return result
+
+    monkeypatch.setattr(db, "query", racing_query)
+    assert create_demo_admin_user(db).email == "first@pyarena.dev"
+
+
+def test_current_user_cached(client, db, auth_headers, fake_redis):
+    """Test get_current_user serves the cached record until it is invalidated"""
+    assert client.get("/api/users/me", headers=auth_headers).status_code == 200
+    assert client.portal.call(fake_redis.exists, "auth_user:testuser")
+
+    db.query(User).update({User.full_name: "Renamed"})
+    db.commit()
+
+    response = client.get("/api/users/me", headers=auth_headers)
+    assert response.json()["full_name"] == "Test User"
+
+
+def test_current_user_cache_hit_skips_input_validation(client, db, fake_redis):
+    """Test a cached user is rebuilt without re-applying UserResponse's input rules"""
+    db.add(User(username="ox", email="odd@localhost", hashed_password="x"))
+    db.commit()
+    headers = {"Authorization": f"Bearer {auth_utils.create_access_token({'sub': 'ox'})}"}
+
+    for _ in range(2):
+        response = client.get("/api/analytics/api-usage", headers=headers)
+        assert response.status_code == 200
+    assert client.portal.call(fake_redis.exists, "auth_user:ox")
@@ -0,0 +1,111 @@
+"""
+Test Cache Utilities
+Mission 7: Echo of Time
+"""
+
+import time
+
+from app.utils import cache_utils
+from app.utils.cache_utils import (
+    cached,
+    clear_cache_pattern,
+    delete_cached,
+    get_redis_client,
+    make_cache_key
+)
+
+
+def make_counted(calls, key_prefix="scroll"):
+    """A cached coroutine that records every real call"""
+    @cached(expire=60, key_prefix=key_prefix)
+    async def read_scroll(scroll_id):
+        calls.append(scroll_id)
+        return {"scroll_id": scroll_id}
+
+    return read_scroll
+
+
+def test_make_cache_key_canonical():
+    """Test equal calls share a key regardless of kwarg order"""
+    def read_scroll():
+        pass
+
+    key = make_cache_key("scroll", read_scroll, (1,), {"a": 1, "b": {"x": 1, "y": 2}})
+    assert key.startswith("scroll:read_scroll:")
+    assert key == make_cache_key("scroll", read_scroll, (1,), {"b": {"y": 2, "x": 1}, "a": 1})
+    assert key != make_cache_key("scroll", read_scroll, (2,), {"a": 1, "b": {"x": 1, "y": 2}})
+
+
+def test_redis_skipped_while_marked_unavailable(monkeypatch):
+    """Test get_redis_client backs off after a connection failure"""
+    monkeypatch.setattr(cache_utils, "_redis_unavailable_until", time.monotonic() + 30)
+    assert get_redis_client() is None
+
+
+async def test_cached_uses_l1_without_redis():
+    """Test results are still served from the in-process cache while Redis is down"""
+    calls = []
+    read_scroll = make_counted(calls)
+
+    assert await read_scroll(1) == {"scroll_id": 1}
+    assert await read_scroll(1) == {"scroll_id": 1}
+    await read_scroll(2)
+
+    assert calls == [1, 2]
+
+
+async def test_cached_falls_back_to_redis(fake_redis):
+    """Test a result evicted from L1 is served from Redis"""
+    calls = []
+    read_scroll = make_counted(calls)
+
+    await read_scroll(1)
+    cache_utils._l1_cache.clear()
+
+    assert await read_scroll(1) == {"scroll_id": 1}
+    assert calls == [1]
+    assert len(await fake_redis.keys("scroll:read_scroll:*")) == 1
+
+
+async def test_delete_cached_evicts_l1(fake_redis):
+    """Test deleting a key drops it from both cache tiers"""
+    calls = []
+    read_scroll = make_counted(calls)
+
+    await read_scroll(1)
+    key = make_cache_key("scroll", read_scroll.__wrapped__, (1,), {})
+    assert await delete_cached(key)
+
+    await read_scroll(1)
+    assert calls == [1, 1]
+
+
+async def test_clear_cache_pattern_in_batches(fake_redis, monkeypatch):
+    """Test pattern clears span several SCAN batches and evict matching L1 keys"""
+    monkeypatch.setattr(cache_utils, "REDIS_SCAN_BATCH", 2)
+    for limit in range(5):
+        await fake_redis.set(f"leaderboard:{limit}", b"{}")
+    await fake_redis.set("stats:users:v1", b"{}")
+    cache_utils._l1_set("leaderboard:10", {})
+    cache_utils._l1_set("stats:users:v1", {})
+
+    assert await clear_cache_pattern("leaderboard:*") == 5
+
+    assert await fake_redis.keys("leaderboard:*") == []
+    assert await fake_redis.exists("stats:users:v1")
+    assert cache_utils._l1_get("leaderboard:10") is cache_utils._MISSING
+    assert cache_utils._l1_get("stats:users:v1") == {}
+
+
+async def test_delete_cached_treats_key_literally():
+    """Test glob characters in a key only ever evict that exact key"""
+    cache_utils._l1_set("scroll[1]", {})
+    cache_utils._l1_set("scroll1", {})
+    cache_utils._l1_set("scroll*", {})
+
+    await delete_cached("scroll[1]")
+    await delete_cached("scroll*")
+
+    assert cache_utils._l1_get("scroll[1]") is cache_utils._MISSING
+    assert cache_utils._l1_get("scroll*") is cache_utils._MISSING
+    assert cache_utils._l1_get("scroll1") == {}
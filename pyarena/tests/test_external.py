@@ -0,0 +1,172 @@
+"""
+Test External API Endpoints
+Mission 4: External Scrolls
+"""
+
+import asyncio
+
+import httpx
+import orjson
+import pytest
+
+from app.main import app
+from app.models import APILog
+from app.routers import external
+
+
+PUBLIC_APIS = {
+    "count": 3,
+    "entries": [
+        {"API": "Cat Facts", "Category": "Animals"},
+        {"API": "Dog Pics", "Category": "Animals"},
+        {"API": "Open Library", "Category": "Books"},
+    ]
+}
+
+
+@pytest.fixture
+def upstream_calls(client):
+    """
+    Replace the shared HTTP client with a mock transport serving PUBLIC_APIS.
+    Returns the list of requests the mock received.
+    """
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(
+            200,
+            content=orjson.dumps(PUBLIC_APIS),
+            headers={"content-type": "application/json"}
+        )
+
+    real_client = app.state.http
+    app.state.http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    app.state.public_apis_cache = None
+    yield calls
+    app.state.http = real_client
+    app.state.public_apis_cache = None
+
+
+def test_public_apis_filter_by_category(client, upstream_calls):
+    """Test category filtering is case-insensitive"""
+    response = client.get("/api/external/public-apis?category=animals")
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["count"] == 2
+    assert [api["API"] for api in data["apis"]] == ["Cat Facts", "Dog Pics"]
+
+
+def test_public_apis_cached(client, upstream_calls):
+    """Test the catalogue is fetched once and reused across requests"""
+    client.get("/api/external/public-apis")
+    response = client.get("/api/external/public-apis?category=books")
+
+    assert response.json()["count"] == 1
+    assert len(upstream_calls) == 1
+
+
+def test_fetch_external_data(client, db, auth_headers, upstream_calls):
+    """Test fetched JSON is wrapped with status code and timing"""
+    response = client.get(
+        "/api/external/fetch?url=https://api.publicapis.org/entries",
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["status_code"] == 200
+    assert data["data"] == PUBLIC_APIS
+    assert data["response_time"] >= 0
+
+    # The call is logged by the background writer into the test database
+    client.portal.call(app.state.log_queue.join)
+    log = db.query(APILog).one()
+    assert log.endpoint == "https://api.publicapis.org/entries"
+    assert log.status_code == 200
+
+
+def make_log(i):
+    """API log values as queued by log_api_call"""
+    return {
+        'user_id': 1,
+        'endpoint': f"/scroll/{i}",
+        'method': "GET",
+        'status_code': 200,
+        'response_time': 1.0
+    }
+
+
+@pytest.fixture
+def log_batches(monkeypatch):
+    """Record the size of every batch passed to write_api_logs"""
+    batches = []
+    write_api_logs = external.write_api_logs
+
+    def recording_write(session_factory, logs):
+        batches.append(len(logs))
+        write_api_logs(session_factory, logs)
+
+    monkeypatch.setattr(external, "write_api_logs", recording_write)
+    return batches
+
+
+async def test_api_log_writer_batches_by_size(db, session_factory, log_batches, monkeypatch):
+    """Test a full batch is written without waiting for the flush interval"""
+    monkeypatch.setattr(external, "LOG_BATCH_SIZE", 2)
+    monkeypatch.setattr(external, "LOG_FLUSH_INTERVAL", 10)
+    queue = asyncio.Queue()
+    for i in range(4):
+        queue.put_nowait(make_log(i))
+
+    writer = asyncio.create_task(external.api_log_writer(queue, session_factory))
+    await asyncio.wait_for(queue.join(), timeout=2)
+    writer.cancel()
+    await asyncio.gather(writer, return_exceptions=True)
+
+    assert log_batches[:2] == [2, 2]
+    assert db.query(APILog).count() == 4
+
+
+async def test_api_log_writer_flushes_after_interval(db, session_factory, log_batches, monkeypatch):
+    """Test a partial batch is written once the flush interval passes"""
+    monkeypatch.setattr(external, "LOG_FLUSH_INTERVAL", 0.01)
+    queue = asyncio.Queue()
+    queue.put_nowait(make_log(0))
+
+    writer = asyncio.create_task(external.api_log_writer(queue, session_factory))
+    await asyncio.wait_for(queue.join(), timeout=2)
+    writer.cancel()
+    await asyncio.gather(writer, return_exceptions=True)
+
+    assert log_batches[0] == 1
+    assert db.query(APILog).count() == 1
+
+
+async def test_api_log_writer_flushes_on_cancel(db, session_factory, monkeypatch):
+    """Test logs collected before cancellation are still written"""
+    monkeypatch.setattr(external, "LOG_FLUSH_INTERVAL", 10)
+    queue = asyncio.Queue()
+    queue.put_nowait(make_log(0))
+    queue.put_nowait(make_log(1))
+
+    writer = asyncio.create_task(external.api_log_writer(queue, session_factory))
+    await asyncio.sleep(0.05)
+    writer.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await writer
+
+    assert db.query(APILog).count() == 2
+
+
+def test_drain_api_logs_for_shutdown(db, session_factory):
+    """Test the shutdown path writes everything still queued"""
+    queue = asyncio.Queue()
+    for i in range(3):
+        queue.put_nowait(make_log(i))
+
+    external.write_api_logs(session_factory, external.drain_api_logs(queue))
+
+    assert queue.empty()
+    assert db.query(APILog).count() == 3
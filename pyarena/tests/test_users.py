@@ -5,6 +5,8 @@ Mission 2: Records of Apprentices
 
 import pytest
 
+from app.models import User
+
 
 def test_create_user(client, sample_user_data):
     """Test user creation"""
@@ -28,6 +30,19 @@ def test_create_duplicate_user(client, sample_user_data):
     # Try to create duplicate
     response = client.post("/api/users/", json=sample_user_data)
     assert response.status_code == 400
+    assert response.json()["detail"] == "Email already registered"
+
+
+def test_create_user_duplicate_username(client, sample_user_data):
+    """Test that a taken username is rejected even with a new email"""
+    client.post("/api/users/", json=sample_user_data)
+
+    response = client.post(
+        "/api/users/",
+        json={**sample_user_data, "email": "other@example.com"}
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Username already taken"
 
 
 def test_get_users(client, sample_user_data):
@@ -44,6 +59,41 @@ def test_get_users(client, sample_user_data):
     assert len(users) >= 1
 
 
+def test_get_users_keyset_pagination(client):
+    """Test paging through users with the after_id cursor"""
+    for i in range(3):
+        client.post("/api/users/", json={
+            "username": f"member{i}",
+            "email": f"member{i}@example.com",
+            "password": "password123"
+        })
+
+    response = client.get("/api/users/?limit=2")
+    assert response.status_code == 200
+    first_page = response.json()
+    assert [u["username"] for u in first_page] == ["member0", "member1"]
+
+    cursor = response.headers["X-Next-Cursor"]
+    assert cursor == str(first_page[-1]["id"])
+
+    response = client.get(f"/api/users/?after_id={cursor}&limit=2")
+    second_page = response.json()
+    assert [u["username"] for u in second_page] == ["member2"]
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_get_users_cursor_exposed_to_cors(client):
+    """Test cross-origin clients may read the pagination cursor"""
+    response = client.get("/api/users/", headers={"Origin": "https://example.com"})
+    assert "X-Next-Cursor" in response.headers["access-control-expose-headers"]
+
+
+def test_get_users_rejects_skip(client):
+    """Test the removed offset parameter is rejected rather than ignored"""
+    response = client.get("/api/users/?skip=100")
+    assert response.status_code == 400
+
+
 def test_get_user_by_id(client, create_test_user):
     """Test getting specific user"""
     user_id = create_test_user["id"]
@@ -82,6 +132,49 @@ def test_update_user(client, create_test_user, auth_headers):
     assert data["full_name"] == update_data["full_name"]
 
 
+def test_update_user_invalid_guild_rank(client, create_test_user, auth_headers):
+    """Test guild_rank only accepts known ranks"""
+    response = client.put(
+        f"/api/users/{create_test_user['id']}",
+        json={"guild_rank": "Grandmaster"},
+        headers=auth_headers
+    )
+    assert response.status_code == 422
+
+
+def test_get_users_with_legacy_guild_rank(client, db, auth_headers):
+    """Test users stored with a rank outside GuildRank can still be served"""
+    db.query(User).update({User.guild_rank: "Grandmaster"})
+    db.commit()
+
+    response = client.get("/api/users/me", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["guild_rank"] == "Grandmaster"
+
+    response = client.get("/api/users/")
+    assert response.status_code == 200
+    assert response.json()[0]["guild_rank"] == "Grandmaster"
+
+
+def test_delete_user(client, db, auth_headers):
+    """Test an admin can delete a user"""
+    db.query(User).update({User.is_admin: True})
+    db.commit()
+
+    response = client.post("/api/users/", json={
+        "username": "departing",
+        "email": "departing@example.com",
+        "password": "password123"
+    })
+    user_id = response.json()["id"]
+
+    response = client.delete(f"/api/users/{user_id}", headers=auth_headers)
+    assert response.status_code == 204
+
+    response = client.get(f"/api/users/{user_id}")
+    assert response.status_code == 404
+
+
 def test_complete_mission(client, create_test_user, auth_headers):
     """Test mission completion"""
     user_id = create_test_user["id"]
@@ -98,6 +191,38 @@ def test_complete_mission(client, create_test_user, auth_headers):
     assert data["experience_earned"] == 10  # 100/10
 
 
+def test_complete_mission_rank_up(client, create_test_user, auth_headers):
+    """Test experience accumulates and guild rank updates after 3 missions"""
+    user_id = create_test_user["id"]
+
+    for mission_id in (1, 2, 3):
+        response = client.post(
+            f"/api/users/{user_id}/missions/{mission_id}/complete?score=100",
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+
+    data = response.json()
+    assert data["total_experience"] == 30
+    assert data["guild_rank"] == "Adept"
+
+    user = client.get(f"/api/users/{user_id}").json()
+    assert user["missions_completed"] == 3
+    assert user["guild_rank"] == "Adept"
+
+
+def test_complete_mission_nonexistent_user(client, db, auth_headers):
+    """Test completing a mission for a missing user returns 404"""
+    db.query(User).update({User.is_admin: True})
+    db.commit()
+
+    response = client.post(
+        "/api/users/999999/missions/1/complete",
+        headers=auth_headers
+    )
+    assert response.status_code == 404
+
+
 @pytest.mark.parametrize("username,email,password,expected_status", [
     ("validuser", "valid@email.com", "password123", 201),
     ("ab", "valid@email.com", "password123", 422),  # Username too short